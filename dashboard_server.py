@@ -0,0 +1,317 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from collections import Counter, deque
+from datetime import datetime, timezone
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+RECENT_QUERIES = 1000
+HISTORY_TOP = 100
+SQL_BATCH = 500
+HEADER_TIMEOUT = 5
+
+
+class QueryStats:
+    """Counters and recent-query ring buffers fed by the resolver.
+
+    Live numbers cover queries since startup; anything older comes from
+    SQLite: totals and a bounded top-N of blocked domains are read once
+    (rows up to `start_id`), log pages larger than the ring buffer per
+    request.
+    """
+
+    def __init__(self, db_file, total_blocked_domains, blocked_domains=None, recent=RECENT_QUERIES):
+        self.db_file = db_file
+        self.total_blocked_domains = total_blocked_domains
+        self.blocked_domains = blocked_domains
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.top_blocked = Counter()
+        self.recent = {"blocked": deque(maxlen=recent), "allowed": deque(maxlen=recent)}
+        self.start_id = self._last_query_id()
+        self._history_counts = None
+        self._history_top = None
+        self._history_top_limit = 0
+        self._domain_history = {}
+        self._history_lock = threading.Lock()
+        self._sorted_domains = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _last_query_id(self):
+        try:
+            conn = sqlite3.connect(self.db_file)
+            try:
+                return conn.execute('SELECT MAX(id) FROM queries').fetchone()[0] or 0
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return 0
+
+    def record(self, client_ip, domain, query_type, action, response_time):
+        """Called by the resolver for every answered query"""
+        entry = {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+            "client_ip": client_ip,
+            "domain": domain,
+            "query_type": query_type,
+            "response_time": response_time,
+        }
+        with self.lock:
+            self.counts[action] += 1
+            if action == "blocked":
+                self.top_blocked[domain] += 1
+            self.recent[action].append(entry)
+
+    def history_counts(self):
+        """Per-action totals for queries logged before startup (computed once)"""
+        with self._history_lock:
+            if self._history_counts is None:
+                counts = Counter()
+                try:
+                    conn = sqlite3.connect(self.db_file)
+                    try:
+                        for action, n in conn.execute(
+                                'SELECT action, COUNT(*) FROM queries WHERE id <= ? GROUP BY action',
+                                (self.start_id,)):
+                            counts[action] = n
+                    finally:
+                        conn.close()
+                except sqlite3.Error as e:
+                    print(f"[!] Error reading query history: {e}")
+                self._history_counts = counts
+            return self._history_counts
+
+    def history_top(self, limit):
+        """Most blocked domains before startup, kept to the largest limit asked for"""
+        with self._history_lock:
+            if self._history_top is None or limit > self._history_top_limit:
+                size = max(limit, HISTORY_TOP)
+                top = []
+                try:
+                    conn = sqlite3.connect(self.db_file)
+                    try:
+                        top = conn.execute(
+                            """SELECT domain, COUNT(*) AS n FROM queries
+                               WHERE action='blocked' AND id <= ?
+                               GROUP BY domain ORDER BY n DESC LIMIT ?""",
+                            (self.start_id, size)).fetchall()
+                    finally:
+                        conn.close()
+                except sqlite3.Error as e:
+                    print(f"[!] Error reading query history: {e}")
+                self._history_top = top
+                self._history_top_limit = size
+            return self._history_top
+
+    def stats(self):
+        counts = self.history_counts()
+        with self.lock:
+            blocked = counts["blocked"] + self.counts["blocked"]
+            allowed = counts["allowed"] + self.counts["allowed"]
+        return {
+            "total_blocked_domains": self.total_blocked_domains,
+            "blocked_queries": blocked,
+            "allowed_queries": allowed,
+            "total_queries": blocked + allowed,
+        }
+
+    def domain_history(self, domains):
+        """Exact pre-startup block counts for `domains` (cached, history is fixed)"""
+        with self._history_lock:
+            missing = [d for d in domains if d not in self._domain_history]
+            try:
+                conn = sqlite3.connect(self.db_file)
+                try:
+                    for i in range(0, len(missing), SQL_BATCH):
+                        chunk = missing[i:i + SQL_BATCH]
+                        found = dict(conn.execute(
+                            f"""SELECT domain, COUNT(*) FROM queries
+                                WHERE action='blocked' AND id <= ?
+                                AND domain IN ({','.join('?' * len(chunk))})
+                                GROUP BY domain""",
+                            [self.start_id] + chunk))
+                        for d in chunk:
+                            self._domain_history[d] = found.get(d, 0)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                print(f"[!] Error reading query history: {e}")
+            return {d: self._domain_history.get(d, 0) for d in domains}
+
+    def top_blocked_domains(self, limit):
+        """History top-N merged with live counts, exact for the returned rows.
+
+        A domain outside the stored history top-N has at most `floor` older
+        hits, so only live domains that could still reach the result need
+        their history looked up.
+        """
+        history = self.history_top(limit)
+        with self.lock:
+            live = self.top_blocked.copy()
+
+        merged = Counter(dict(history))
+        floor = history[-1][1] if history and len(history) >= self._history_top_limit else 0
+        outside = [d for d in live if d not in merged]
+        merged.update(live)
+
+        if floor and outside:
+            ranked = merged.most_common(limit)
+            threshold = ranked[-1][1] if len(ranked) >= limit else 0
+            candidates = [d for d in outside if live[d] + floor > threshold]
+            merged.update(self.domain_history(candidates))
+
+        return [{"domain": d, "count": n} for d, n in merged.most_common(limit)]
+
+    def logs(self, action, limit):
+        """Newest first; falls back to SQLite past the ring buffer"""
+        with self.lock:
+            ring = list(self.recent[action])
+        if limit <= len(ring):
+            return ring[::-1][:limit]
+
+        columns = "timestamp, client_ip, domain, query_type"
+        if action == "allowed":
+            columns += ", response_time"
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(f"""SELECT {columns} FROM queries
+                                        WHERE action=? ORDER BY id DESC LIMIT ?""",
+                                    (action, limit)).fetchall()
+                return [dict(row) for row in rows]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return ring[::-1][:limit]
+
+    def domains(self, limit):
+        if self.blocked_domains is not None:
+            if self._sorted_domains is None:
+                self._sorted_domains = sorted(self.blocked_domains)
+            return self._sorted_domains[:limit]
+
+        try:
+            conn = sqlite3.connect(self.db_file)
+            try:
+                rows = conn.execute('SELECT domain FROM blocked ORDER BY domain LIMIT ?', (limit,))
+                return [row[0] for row in rows]
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            return []
+
+
+class DashboardServer:
+    """Async HTTP server for dashboard.html and /api/* inside the resolver"""
+
+    def __init__(self, stats, host, port, html_file, browser_url=None):
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self.html_file = html_file
+        self.browser_url = browser_url
+        self.bound = False
+        self._ready = threading.Event()
+        self._html = None
+
+    def start(self, timeout=5):
+        """Serve from a daemon thread; True once the listener is bound"""
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait(timeout)
+        return self.bound
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except OSError as e:
+            print(f"\n[!] Dashboard ERROR: {e}")
+        finally:
+            self._ready.set()
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.bound = True
+        self._ready.set()
+
+        if self.browser_url:
+            # Console browsers block until they exit; keep that off the loop
+            import webbrowser
+            asyncio.get_running_loop().run_in_executor(None, webbrowser.open, self.browser_url)
+
+        async with server:
+            await server.serve_forever()
+
+    async def _read_head(self, reader):
+        """Request line, with the headers read and discarded"""
+        request_line = await reader.readline()
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return request_line
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(self._read_head(reader), HEADER_TIMEOUT)
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2 or parts[0] not in ('GET', 'HEAD'):
+                status, content_type, body = 405, 'application/json', b'{"detail": "Method not allowed"}'
+            else:
+                url = urlsplit(parts[1])
+                # SQLite fallbacks must not stall other connections
+                loop = asyncio.get_running_loop()
+                status, content_type, body = await loop.run_in_executor(
+                    None, self.route, url.path, parse_qs(url.query))
+
+            head = (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    "Access-Control-Allow-Origin: *\r\n"
+                    "Connection: close\r\n\r\n")
+            writer.write(head.encode('latin-1'))
+            if parts and parts[0] != 'HEAD':
+                writer.write(body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError):
+            # ValueError: request line or header over the StreamReader limit
+            pass
+        finally:
+            writer.close()
+
+    def route(self, path, params):
+        """Return (status, content type, body) for a request path"""
+        def limit(default):
+            try:
+                return int(params.get('limit', [default])[0])
+            except ValueError:
+                return default
+
+        if path in ('/', '/dashboard.html'):
+            if self._html is None:
+                try:
+                    with open(self.html_file, 'rb') as f:
+                        self._html = f.read()
+                except OSError:
+                    return 404, 'application/json', b'{"detail": "Dashboard file not found"}'
+            return 200, 'text/html; charset=utf-8', self._html
+
+        if path == '/api/stats':
+            data = self.stats.stats()
+        elif path == '/api/top-blocked':
+            data = self.stats.top_blocked_domains(limit(10))
+        elif path == '/api/logs/blocked':
+            data = self.stats.logs("blocked", limit(100))
+        elif path == '/api/logs/allowed':
+            data = self.stats.logs("allowed", limit(100))
+        elif path == '/api/domains':
+            data = self.stats.domains(limit(1000))
+        else:
+            return 404, 'application/json', b'{"detail": "Not found"}'
+
+        return 200, 'application/json', json.dumps(data).encode('utf-8')
@@ -1,28 +1,15 @@
 import pickle
 import sys
-import math
-import pandas as pd
+import os
+from fast_classifier import FEATURES, FlatForest, feature_vector
 
-# We need to replicate the feature extraction logic exactly as in training
-def entropy(s):
-    prob = [float(s.count(c)) / len(s) for c in dict.fromkeys(list(s))]
-    entropy = - sum([p * math.log(p) / math.log(2.0) for p in prob])
-    return entropy
+FLAT_MODEL_DIR = 'dns_classifier_flat'
 
 def extract_features(domain):
-    features = {}
-    features['length'] = len(domain)
-    features['num_digits'] = sum(c.isdigit() for c in domain)
-    features['entropy'] = entropy(domain)
-    features['num_dots'] = domain.count('.')
-    suspicious_keywords = ['ad', 'track', 'analytic', 'pixel', 'stats', 'count', 'click', 'offer', 'sale']
-    features['has_keyword'] = 1 if any(k in domain for k in suspicious_keywords) else 0
-    vowels = "aeiou"
-    num_vowels = sum(1 for c in domain.lower() if c in vowels)
-    num_cons = sum(1 for c in domain.lower() if c.isalpha() and c not in vowels)
-    features['vowel_ratio'] = num_vowels / (num_cons + 1)
-    
+    features = dict(zip(FEATURES, feature_vector(domain)))
+
     # Return as DataFrame for the model
+    import pandas as pd
     return pd.DataFrame([features])
 
 def main():
@@ -39,6 +26,18 @@ def main():
         classify(domain)
 
 def classify(domain):
+    # Prefer the flat export: no pandas/sklearn import, memory-mapped arrays
+    if os.path.exists(os.path.join(FLAT_MODEL_DIR, 'meta.json')):
+        try:
+            label, confidence = FlatForest.load(FLAT_MODEL_DIR).classify([domain])[0]
+        except (ValueError, OSError) as e:
+            print(f"Warning: flat model unusable ({e}), falling back to dns_classifier.pkl")
+        else:
+            print(f"\nDomain: {domain}")
+            print(f"Prediction: {label.upper()}")
+            print(f"Confidence: {confidence:.2f}")
+            return
+
     try:
         with open('dns_classifier.pkl', 'rb') as f:
             clf = pickle.load(f)
@@ -0,0 +1,175 @@
+import json
+import math
+import os
+import numpy as np
+
+# Flat forest export format. Bump FORMAT_VERSION whenever the array layout
+# or meta.json fields change so old exports are rejected instead of misread.
+FORMAT_VERSION = 1
+META_FILE = 'meta.json'
+META_KEYS = ['classes', 'n_trees', 'n_nodes', 'max_depth']
+ARRAYS = ['left', 'right', 'feature', 'threshold', 'proba', 'roots']
+
+FEATURES = ['length', 'num_digits', 'entropy', 'num_dots', 'has_keyword', 'vowel_ratio']
+SUSPICIOUS_KEYWORDS = ['ad', 'track', 'analytic', 'pixel', 'stats', 'count', 'click', 'offer', 'sale']
+VOWELS = "aeiou"
+
+
+# The one feature implementation: train_model.py trains on it and the
+# predictors score with it, in FEATURES order, without pandas or sklearn.
+def entropy(s):
+    prob = [float(s.count(c)) / len(s) for c in dict.fromkeys(list(s))]
+    return - sum([p * math.log(p) / math.log(2.0) for p in prob])
+
+def feature_vector(domain):
+    lower = domain.lower()
+    num_vowels = sum(1 for c in lower if c in VOWELS)
+    num_cons = sum(1 for c in lower if c.isalpha() and c not in VOWELS)
+    return [
+        len(domain),
+        sum(c.isdigit() for c in domain),
+        entropy(domain),
+        domain.count('.'),
+        1 if any(k in domain for k in SUSPICIOUS_KEYWORDS) else 0,
+        num_vowels / (num_cons + 1),
+    ]
+
+def featurize(domains):
+    """Feature matrix for a batch of domains"""
+    return np.array([feature_vector(d) for d in domains], dtype=np.float32)
+
+
+def export_forest(clf, path, max_depth=None):
+    """Flatten a fitted sklearn forest into NumPy arrays under `path`.
+
+    All trees share one node table; `roots` holds each tree's first node.
+    Leaves have feature -1. With `max_depth`, deeper subtrees are cut and
+    the node becomes a leaf carrying its own class distribution.
+    """
+    left, right, feature, threshold, proba, roots = [], [], [], [], [], []
+    depth_reached = 0
+
+    for est in clf.estimators_:
+        t = est.tree_
+        value = t.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+
+        # Pre-order walk collecting kept nodes, so children get new ids
+        keep = []
+        stack = [(0, 0)]
+        while stack:
+            node, depth = stack.pop()
+            is_leaf = t.children_left[node] == -1 or (max_depth is not None and depth >= max_depth)
+            keep.append((node, is_leaf))
+            depth_reached = max(depth_reached, depth)
+            if not is_leaf:
+                stack.append((t.children_right[node], depth + 1))
+                stack.append((t.children_left[node], depth + 1))
+
+        offset = len(left)
+        new_id = {node: offset + i for i, (node, _) in enumerate(keep)}
+        roots.append(offset)
+
+        for node, is_leaf in keep:
+            if is_leaf:
+                left.append(-1)
+                right.append(-1)
+                feature.append(-1)
+                threshold.append(0.0)
+            else:
+                left.append(new_id[t.children_left[node]])
+                right.append(new_id[t.children_right[node]])
+                feature.append(t.feature[node])
+                threshold.append(t.threshold[node])
+            proba.append(value[node])
+
+    arrays = {
+        'left': np.array(left, dtype=np.int32),
+        'right': np.array(right, dtype=np.int32),
+        'feature': np.array(feature, dtype=np.int16),
+        'threshold': np.array(threshold, dtype=np.float64),
+        'proba': np.array(proba, dtype=np.float64),
+        'roots': np.array(roots, dtype=np.int32),
+    }
+
+    os.makedirs(path, exist_ok=True)
+    for name in ARRAYS:
+        np.save(os.path.join(path, f'{name}.npy'), arrays[name])
+
+    # meta.json is written last: an export without it is incomplete
+    meta = {
+        'format_version': FORMAT_VERSION,
+        'features': FEATURES,
+        'classes': [str(c) for c in clf.classes_],
+        'n_trees': len(roots),
+        'n_nodes': len(left),
+        'max_depth': depth_reached,
+    }
+    with open(os.path.join(path, META_FILE), 'w') as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+
+class FlatForest:
+    """Random forest scorer over arrays written by export_forest"""
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.classes = np.array(meta['classes'])
+        self.max_depth = meta['max_depth']
+        self.left = arrays['left']
+        self.right = arrays['right']
+        self.feature = arrays['feature']
+        self.threshold = arrays['threshold']
+        self.proba = arrays['proba']
+        self.roots = arrays['roots']
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """Open an export; arrays are memory-mapped unless mmap=False"""
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+
+        if not isinstance(meta, dict):
+            raise ValueError("Model metadata is not a JSON object")
+        if meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported model format {meta.get('format_version')} "
+                             f"(expected {FORMAT_VERSION})")
+        if meta.get('features') != FEATURES:
+            raise ValueError("Model was exported with a different feature set")
+        missing = [key for key in META_KEYS if key not in meta]
+        if missing:
+            raise ValueError(f"Model metadata is missing {', '.join(missing)}")
+
+        mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode)
+                  for name in ARRAYS}
+        return cls(meta, arrays)
+
+    def predict_proba(self, X):
+        """Class probabilities for a (n_samples, n_features) batch"""
+        # sklearn compares float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, None]
+        node = np.tile(self.roots, (len(X), 1))
+
+        # Advance every (sample, tree) pair one level per step
+        for _ in range(self.max_depth):
+            feat = self.feature[node]
+            inner = feat >= 0
+            if not inner.any():
+                break
+            go_left = X[rows, np.where(inner, feat, 0)] <= self.threshold[node]
+            child = np.where(go_left, self.left[node], self.right[node])
+            node = np.where(inner, child, node)
+
+        return self.proba[node].mean(axis=1)
+
+    def predict(self, X):
+        return self.classes[self.predict_proba(X).argmax(axis=1)]
+
+    def classify(self, domains):
+        """(label, confidence) for each domain"""
+        proba = self.predict_proba(featurize(domains))
+        return [(self.classes[i], float(p[i])) for p, i in zip(proba, proba.argmax(axis=1))]
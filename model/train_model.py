@@ -1,47 +1,88 @@
 import pandas as pd
 import numpy as np
 import pickle
-import math
+import os
+import time
+import argparse
+import tracemalloc
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, accuracy_score
 import collections
+from fast_classifier import FEATURES, FlatForest, export_forest, featurize
 
-def entropy(s):
-    """Calculates the Shannon entropy of a string."""
-    prob = [float(s.count(c)) / len(s) for c in dict.fromkeys(list(s))]
-    entropy = - sum([p * math.log(p) / math.log(2.0) for p in prob])
-    return entropy
+def distill(teacher, X_train, n_trees):
+    """Fit a smaller forest on the teacher's own predictions"""
+    student = RandomForestClassifier(n_estimators=n_trees, random_state=42)
+    student.fit(X_train, teacher.predict(X_train))
+    return student
 
-def extract_features(domain):
-    """Extracts features from a domain name."""
-    features = {}
-    
-    # 1. Length of domain
-    features['length'] = len(domain)
-    
-    # 2. Number of digits
-    features['num_digits'] = sum(c.isdigit() for c in domain)
-    
-    # 3. Entropy
-    features['entropy'] = entropy(domain)
-    
-    # 4. Number of subdomains (dots)
-    features['num_dots'] = domain.count('.')
-    
-    # 5. Presence of suspicious keywords
-    suspicious_keywords = ['ad', 'track', 'analytic', 'pixel', 'stats', 'count', 'click', 'offer', 'sale']
-    features['has_keyword'] = 1 if any(k in domain for k in suspicious_keywords) else 0
-    
-    # 6. Vowel to consonant ratio (ads sometimes have random strings)
-    vowels = "aeiou"
-    num_vowels = sum(1 for c in domain.lower() if c in vowels)
-    num_cons = sum(1 for c in domain.lower() if c.isalpha() and c not in vowels)
-    features['vowel_ratio'] = num_vowels / (num_cons + 1) # +1 to avoid div zero
+def benchmark(model_filename, export_dir, X_test, y_test):
+    """Compare the pickle path against the flat export on the test split"""
+    X_df = X_test[FEATURES]
+    X_arr = X_df.to_numpy(dtype=np.float32)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(model_filename, 'rb') as f:
+        clf = pickle.load(f)
+    pickle_load = time.perf_counter() - start
+    pickle_mem = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    forest = FlatForest.load(export_dir)
+    flat_load = time.perf_counter() - start
+    flat_mem = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    def rate(fn, X):
+        start = time.perf_counter()
+        fn(X)
+        return len(X) / (time.perf_counter() - start)
 
-    return features
+    # Single-domain scoring, the way classify_domain.py calls the model
+    singles = min(len(X_df), 200)
+    start = time.perf_counter()
+    for i in range(singles):
+        clf.predict(X_df.iloc[[i]])
+    pickle_single = singles / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for i in range(singles):
+        forest.predict(X_arr[i:i + 1])
+    flat_single = singles / (time.perf_counter() - start)
+
+    pickle_pred = clf.predict(X_df)
+    flat_pred = forest.predict(X_arr)
+    export_size = sum(os.path.getsize(os.path.join(export_dir, name))
+                      for name in os.listdir(export_dir))
+
+    print("\nPickle vs flat export:")
+    print(f"{'':22}{'pickle':>14}{'flat':>14}")
+    print(f"{'Load time (ms)':22}{pickle_load * 1000:14.1f}{flat_load * 1000:14.1f}")
+    print(f"{'Load memory (KB)':22}{pickle_mem / 1024:14.1f}{flat_mem / 1024:14.1f}")
+    print(f"{'Size on disk (KB)':22}{os.path.getsize(model_filename) / 1024:14.1f}{export_size / 1024:14.1f}")
+    print(f"{'Batch preds/sec':22}{rate(clf.predict, X_df):14,.0f}{rate(forest.predict, X_arr):14,.0f}")
+    print(f"{'Single preds/sec':22}{pickle_single:14,.0f}{flat_single:14,.0f}")
+    print(f"{'Accuracy':22}{accuracy_score(y_test, pickle_pred):14.4f}{accuracy_score(y_test, flat_pred):14.4f}")
+    print(f"Prediction agreement: {np.mean(pickle_pred == flat_pred):.4f}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train the DNS domain classifier")
+    parser.add_argument('--export-dir', default='dns_classifier_flat',
+                        help="Directory for the flat NumPy export")
+    parser.add_argument('--prune-depth', type=int, default=None,
+                        help="Cut exported trees below this depth")
+    parser.add_argument('--distill', type=int, default=None, metavar='N_TREES',
+                        help="Export a smaller forest distilled from the full one")
+    parser.add_argument('--no-benchmark', action='store_true',
+                        help="Skip the pickle vs flat comparison")
+    return parser.parse_args()
 
 def train():
+    args = parse_args()
+
     print("Loading dataset...")
     try:
         df = pd.read_csv('dataset.csv')
@@ -50,11 +91,8 @@ def train():
         return
 
     print("Extracting features...")
-    features_list = []
-    for domain in df['domain']:
-        features_list.append(extract_features(str(domain)))
-    
-    X = pd.DataFrame(features_list)
+    # Shared with the flat predictor so training and scoring cannot drift
+    X = pd.DataFrame(featurize(df['domain'].astype(str)), columns=FEATURES)
     y = df['label']
     
     print(f"Training on {len(X)} samples...")
@@ -77,5 +115,17 @@ def train():
         pickle.dump(clf, f)
     print(f"Model saved to {model_filename}")
 
+    exported = clf
+    if args.distill:
+        print(f"\nDistilling into {args.distill} trees...")
+        exported = distill(clf, X_train, args.distill)
+
+    meta = export_forest(exported, args.export_dir, max_depth=args.prune_depth)
+    print(f"Flat model exported to {args.export_dir} "
+          f"({meta['n_trees']} trees, {meta['n_nodes']:,} nodes, depth {meta['max_depth']})")
+
+    if not args.no_benchmark:
+        benchmark(model_filename, args.export_dir, X_test, y_test)
+
 if __name__ == '__main__':
     train()
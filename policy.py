@@ -0,0 +1,178 @@
+import ipaddress
+import json
+import os
+import sqlite3
+
+DEFAULT_GROUP = "default"
+
+
+class CidrIndex:
+    """Longest-prefix match of client IPs against CIDR rules.
+
+    Rules live in a binary radix trie (one per address family), so a lookup
+    walks at most 32 (IPv4) or 128 (IPv6) nodes no matter how many rules
+    or groups are configured.
+    """
+
+    def __init__(self):
+        # Node layout: [child_0, child_1, value]
+        self._roots = {4: [None, None, None], 6: [None, None, None]}
+
+    def insert(self, cidr, value):
+        """Map every address inside `cidr` to `value`"""
+        net = ipaddress.ip_network(cidr, strict=False)
+        node = self._roots[net.version]
+        width = net.max_prefixlen
+        addr = int(net.network_address)
+
+        for i in range(net.prefixlen):
+            bit = (addr >> (width - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, None]
+            node = node[bit]
+
+        node[2] = value
+
+    def lookup(self, ip, default=None):
+        """Return the value of the most specific CIDR containing `ip`"""
+        try:
+            addr = ipaddress.ip_address(ip)
+        except ValueError:
+            return default
+
+        if addr.version == 6 and addr.ipv4_mapped:
+            addr = addr.ipv4_mapped
+
+        node = self._roots[addr.version]
+        best = node[2] if node[2] is not None else default
+        value = int(addr)
+
+        for i in range(addr.max_prefixlen - 1, -1, -1):
+            node = node[(value >> i) & 1]
+            if node is None:
+                break
+            if node[2] is not None:
+                best = node[2]
+
+        return best
+
+
+class PolicyGroup:
+    """A named set of blocklists and allowlists applied to some clients"""
+
+    def __init__(self, name, blocklists, allowlists):
+        self.name = name
+        self.blocklists = tuple(blocklists)
+        self.allowlists = tuple(allowlists)
+
+    def is_blocked(self, domain):
+        """Allowlists win over blocklists; parent domains match too"""
+        domain = domain.lower().rstrip('.')
+        parts = domain.split('.')
+        candidates = ['.'.join(parts[i:]) for i in range(len(parts))]
+
+        for domains in self.allowlists:
+            if any(d in domains for d in candidates):
+                return False
+
+        for domains in self.blocklists:
+            if any(d in domains for d in candidates):
+                return True
+
+        return False
+
+
+def load_domain_list(source, db_file):
+    """Load a list source into a frozenset of domains.
+
+    `db:<table>` reads the `domain` column of a table in the database,
+    anything else is treated as a hosts-style or plain domain file.
+    """
+    if source.startswith("db:"):
+        table = '"' + source[3:].replace('"', '""') + '"'
+        conn = sqlite3.connect(db_file)
+        try:
+            cursor = conn.execute(f'SELECT domain FROM {table}')
+            return frozenset(row[0].lower().rstrip('.') for row in cursor if row[0])
+        finally:
+            conn.close()
+
+    domains = set()
+    with open(source, 'r', encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+
+            parts = line.split()
+            if len(parts) >= 2 and parts[0] in ('0.0.0.0', '127.0.0.1'):
+                domain = parts[1]
+            elif len(parts) == 1 and '.' in parts[0]:
+                domain = parts[0]
+            else:
+                continue
+
+            domains.add(domain.lower().rstrip('.'))
+
+    return frozenset(domains)
+
+
+class Policy:
+    """Client CIDR index plus the groups it resolves to"""
+
+    def __init__(self, index, groups, lists):
+        self.index = index
+        self.groups = groups
+        self.lists = lists
+
+    def group_for(self, client_ip):
+        """Name of the policy group that applies to `client_ip`"""
+        return self.index.lookup(client_ip, DEFAULT_GROUP)
+
+    def is_blocked(self, group_name, domain):
+        group = self.groups.get(group_name) or self.groups[DEFAULT_GROUP]
+        return group.is_blocked(domain)
+
+
+def load_policy(config, db_file):
+    """Build a Policy from a {group: {cidrs, blocklists, allowlists}} mapping.
+
+    Each list source is loaded once and the same frozenset is shared by
+    every group that references it.
+    """
+    lists = {}
+
+    def shared(source):
+        if source not in lists:
+            lists[source] = load_domain_list(source, db_file)
+        return lists[source]
+
+    if not isinstance(config, dict):
+        raise ValueError("Policy groups must be a mapping of group name to spec")
+
+    index = CidrIndex()
+    groups = {}
+
+    for name, spec in config.items():
+        if not isinstance(spec, dict):
+            raise ValueError(f"Policy group {name!r} must be a mapping, got {type(spec).__name__}")
+        groups[name] = PolicyGroup(
+            name,
+            [shared(s) for s in spec.get("blocklists", [])],
+            [shared(s) for s in spec.get("allowlists", [])],
+        )
+        for cidr in spec.get("cidrs", []):
+            index.insert(cidr, name)
+
+    if DEFAULT_GROUP not in groups:
+        groups[DEFAULT_GROUP] = PolicyGroup(DEFAULT_GROUP, [shared("db:blocked")], [])
+
+    return Policy(index, groups, lists)
+
+
+def read_policy_file(path):
+    """Read group definitions from a JSON file, or None if it is missing"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
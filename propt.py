@@ -4,10 +4,7 @@ import time
 from dnslib import DNSRecord, DNSHeader, RR, QTYPE, A, AAAA
 from datetime import datetime
 from functools import lru_cache
-import subprocess
-import webbrowser
-import time
-from threading import Thread
+from policy import DEFAULT_GROUP, load_policy, read_policy_file
 
 # Configuration
 LISTEN_IP = "0.0.0.0"
@@ -16,6 +13,25 @@ UPSTREAM_DNS = ("8.8.8.8", 53)
 SINKHOLE_IP = "0.0.0.0"
 BLOCKLIST_FILE = "blocklist.txt"
 DB_FILE = "database/dns_filter.db"
+POLICY_FILE = "policy_groups.json"
+WEB_HOST = "0.0.0.0"
+WEB_PORT = 8000
+DASHBOARD_FILE = "dashboard.html"
+OPEN_BROWSER = False
+
+# Policy groups: client CIDRs -> blocklists/allowlists. Overridden by
+# POLICY_FILE when present. Clients matching no CIDR use "default".
+# List sources are "db:<table>" or a path to a hosts/domain file, e.g.
+#   "kids":    {"cidrs": ["192.168.10.0/24"],
+#               "blocklists": ["db:blocked", "lists/adult.txt"]},
+#   "servers": {"cidrs": ["10.0.0.0/8"], "blocklists": [],
+#               "allowlists": ["lists/infra.txt"]},
+POLICY_GROUPS = {
+    DEFAULT_GROUP: {"cidrs": [], "blocklists": ["db:blocked"], "allowlists": []},
+}
+
+policy = None
+stats = None
 
 
 
@@ -32,32 +48,26 @@ def get_blocked_count():
         print(f"[!] Error reading database: {e}")
         return 0
 
+@lru_cache(maxsize=4096)
+def get_client_group(client_ip):
+    """Resolve the policy group for a client (with caching)"""
+    return policy.group_for(client_ip)
+
 @lru_cache(maxsize=10000)
-def is_blocked_cached(domain):
-    """Check if domain is blocked (with caching)"""
-    domain = domain.lower().rstrip('.')
-    
-    conn = sqlite3.connect(DB_FILE)
-    c = conn.cursor()
-    
-    parts = domain.split('.')
-    domains_to_check = ['.'.join(parts[i:]) for i in range(len(parts))]
-    
-    placeholders = ','.join('?' * len(domains_to_check))
-    c.execute(f'SELECT domain FROM blocked WHERE domain IN ({placeholders}) LIMIT 1', 
-              domains_to_check)
-    
-    result = c.fetchone()
-    conn.close()
-    
-    return result is not None
+def is_blocked_cached(group, domain):
+    """Check if domain is blocked for a policy group (with caching)"""
+    return policy.is_blocked(group, domain)
 
-def is_blocked(domain):
-    """Check if domain should be blocked"""
-    return is_blocked_cached(domain)
+def is_blocked(domain, client_ip=None):
+    """Check if domain should be blocked for this client"""
+    group = get_client_group(client_ip) if client_ip else DEFAULT_GROUP
+    return is_blocked_cached(group, domain)
 
 def log_query(client_ip, domain, query_type, action, response_time):
     """Log DNS query to database"""
+    if stats:
+        stats.record(client_ip, domain, query_type, action, response_time)
+
     try:
         conn = sqlite3.connect(DB_FILE)
         c = conn.cursor()
@@ -112,7 +122,7 @@ def handle_dns_request(data, client_address):
         client_ip = client_address[0]
         timestamp = datetime.now().strftime("%H:%M:%S")
         
-        if is_blocked(qname):
+        if is_blocked(qname, client_ip):
             print(f"[{timestamp}] BLOCKED: {client_ip:15} → {qname}")
             log_query(client_ip, qname, qtype, "blocked", 0)
             return create_sinkhole_response(request)
@@ -131,12 +141,23 @@ def handle_dns_request(data, client_address):
 
 def start_dns_filter():
     """Start the DNS filtering server"""
+    global policy, stats
+    from dashboard_server import QueryStats
+
     domain_count = get_blocked_count()
+    try:
+        policy = load_policy(read_policy_file(POLICY_FILE) or POLICY_GROUPS, DB_FILE)
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"\n[!] ERROR: Could not load policy groups: {e}")
+        return
+
+    stats = QueryStats(DB_FILE, domain_count, policy.lists.get("db:blocked"))
     
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     
     try:
         sock.bind((LISTEN_IP, DNS_PORT))
+        dashboard = start_server()
         
         print("\n" + "="*60)
         print("DNS FILTERING SERVER (With Logging)")
@@ -146,7 +167,10 @@ def start_dns_filter():
         print(f"Sinkhole IP:      {SINKHOLE_IP}")
         print(f"Database:         {DB_FILE}")
         print(f"Blocked domains:  {domain_count:,}")
+        print(f"Policy groups:    {', '.join(sorted(policy.groups))}")
         print(f"Logging:          ENABLED")
+        if dashboard:
+            print(f"Dashboard:        http://localhost:{WEB_PORT}/")
         print("="*60)
         print("Press Ctrl+C to stop\n")
         
@@ -176,22 +200,15 @@ def start_dns_filter():
 
 
 def start_server():
-    """Start web server and open dashboard"""
-    print("Starting web server on port 8000...")
-    print("Press Ctrl+C to stop\n")
-    
-    # Open browser after 2 seconds
-    time.sleep(2)
-    webbrowser.open("http://localhost:8000/dashboard.html")
-    
-    # Run the command
-    subprocess.run(["python", "-m", "http.server", "8000"])
+    """Start the embedded dashboard server; True if it is listening"""
+    from dashboard_server import DashboardServer
 
+    url = f"http://localhost:{WEB_PORT}/"
+    server = DashboardServer(stats, WEB_HOST, WEB_PORT, DASHBOARD_FILE,
+                             browser_url=url if OPEN_BROWSER else None)
+    return server.start()
 
 
-if __name__ == "__main__":
-    web_thread = Thread(target=start_server, daemon=True)
-    web_thread.start()
 
+if __name__ == "__main__":
     start_dns_filter()
-    
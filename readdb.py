@@ -1,41 +1,200 @@
+import argparse
+import csv
+import json
+import random
 import sqlite3
+import sys
 
-def display_database_content(db_file):
-    conn = sqlite3.connect(db_file)
-    cursor = conn.cursor()
+DB_FILE = "database/dns_filter.db"
+SAMPLE_ROWS = 5
+EXPORT_LIMIT = 10000
+MAX_CELL = 60
 
-    # Get all table names
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = cursor.fetchall()
 
-    if not tables:
-        print("No tables found in the database.")
-    else:
+def connect_readonly(db_file):
+    """Open the database read-only so inspecting never locks out the resolver"""
+    return sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def list_tables(conn):
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+def column_names(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({quote(table)})")]
+
+def has_rowid(conn, table):
+    try:
+        conn.execute(f"SELECT rowid FROM {quote(table)} LIMIT 0")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def row_count(conn, table, estimate=False):
+    """Exact COUNT(*), or a rowid-range estimate that only touches the b-tree edges"""
+    if estimate and has_rowid(conn, table):
+        lo, hi = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote(table)}").fetchone()
+        return 0 if lo is None else hi - lo + 1
+    return conn.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+
+def table_sizes(conn):
+    """Bytes and pages per table/index from dbstat, or None if unavailable"""
+    try:
+        rows = conn.execute(
+            "SELECT name, SUM(pgsize), SUM(pageno) FROM dbstat WHERE aggregate=TRUE GROUP BY name")
+        return {name: (size, pages) for name, size, pages in rows}
+    except sqlite3.OperationalError:
+        return None
+
+def sample_rows(conn, table, n):
+    """Up to n random rows via rowid probes, without scanning the table"""
+    if not has_rowid(conn, table):
+        return conn.execute(f"SELECT * FROM {quote(table)} ORDER BY RANDOM() LIMIT ?", (n,)).fetchall()
+
+    lo, hi = conn.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {quote(table)}").fetchone()
+    if lo is None:
+        return []
+
+    rows = {}
+    for _ in range(n * 3):
+        if len(rows) >= n:
+            break
+        probe = random.randint(lo, hi)
+        row = conn.execute(f"SELECT rowid, * FROM {quote(table)} WHERE rowid >= ? ORDER BY rowid LIMIT 1",
+                           (probe,)).fetchone()
+        if row is not None:
+            rows[row[0]] = row[1:]
+
+    return [rows[k] for k in sorted(rows)]
+
+def format_row(row):
+    cells = []
+    for value in row:
+        text = str(value)
+        cells.append(text if len(text) <= MAX_CELL else text[:MAX_CELL - 3] + "...")
+    return " | ".join(cells)
+
+def inspect_database(db_file, samples=SAMPLE_ROWS, estimate=False):
+    """Print counts, indexes, page usage and a few random rows per table"""
+    conn = connect_readonly(db_file)
+
+    try:
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+
         print(f"\n📂 Database: {db_file}")
         print("=======================================")
+        print(f"Page size:   {page_size:,} bytes")
+        print(f"Pages:       {page_count:,} ({page_size * page_count / 1024 / 1024:.1f} MB)")
+        print(f"Free pages:  {freelist:,}")
+
+        tables = list_tables(conn)
+        if not tables:
+            print("No tables found in the database.")
+            return
+
+        sizes = table_sizes(conn)
 
         for table in tables:
-            table_name = table[0]
-            print(f"\n🗂 TABLE: {table_name}")
+            print(f"\n🗂 TABLE: {table}")
             print("---------------------------------------")
 
-            # Get all rows from the table
-            cursor.execute(f"SELECT * FROM {table_name}")
-            rows = cursor.fetchall()
+            approx = estimate and has_rowid(conn, table)
+            count = row_count(conn, table, approx)
+            print(f"Rows:        {'~' if approx else ''}{count:,}")
+
+            if sizes is not None and table in sizes:
+                size, pages = sizes[table]
+                print(f"Size:        {size / 1024:,.1f} KB ({pages:,} pages)")
+
+            for index in conn.execute(f"PRAGMA index_list({quote(table)})").fetchall():
+                name, unique = index[1], index[2]
+                columns = [row[2] for row in conn.execute(f"PRAGMA index_info({quote(name)})")]
+                line = f"Index:       {name} ({', '.join(c for c in columns if c)})"
+                if unique:
+                    line += " UNIQUE"
+                if sizes is not None and name in sizes:
+                    line += f" {sizes[name][0] / 1024:,.1f} KB"
+                print(line)
+
+            if samples:
+                print(f"\nSample ({samples} random rows):")
+                print(" | ".join(column_names(conn, table)))
+                print("-" * 40)
+                for row in sample_rows(conn, table, samples):
+                    print(format_row(row))
+    finally:
+        conn.close()
+
+def export_table(db_file, table, fmt, output=None, where=None, limit=EXPORT_LIMIT):
+    """Stream up to `limit` rows of `table` as CSV or NDJSON (ValueError if no such table)"""
+    conn = connect_readonly(db_file)
+
+    try:
+        if table not in list_tables(conn):
+            raise ValueError(f"No such table: {table}")
+
+        sql = f"SELECT * FROM {quote(table)}"
+        if where:
+            sql += f" WHERE {where}"
+        sql += " LIMIT ?"
 
-            # Get column names
-            column_names = [description[0] for description in cursor.description]
+        cursor = conn.execute(sql, (limit,))
+        columns = [d[0] for d in cursor.description]
+        out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        written = 0
 
-            print(" | ".join(column_names))
-            print("-" * 40)
+        try:
+            if fmt == 'csv':
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                for row in cursor:
+                    writer.writerow(row)
+                    written += 1
+            else:
+                for row in cursor:
+                    out.write(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+                    written += 1
+        finally:
+            if output:
+                out.close()
 
-            for row in rows:
-                print(row)
+        print(f"[+] Exported {written:,} rows from {table}", file=sys.stderr)
+        return written
+    finally:
+        conn.close()
 
-    conn.close()
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export the DNS filter database")
+    parser.add_argument('--db', default=DB_FILE, help="Database file")
+    parser.add_argument('--samples', type=int, default=SAMPLE_ROWS,
+                        help="Random rows to show per table (0 to skip)")
+    parser.add_argument('--estimate', action='store_true',
+                        help="Estimate row counts from the rowid range instead of COUNT(*)")
+    parser.add_argument('--export', metavar='TABLE', help="Export rows from TABLE instead of inspecting")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv', help="Export format")
+    parser.add_argument('--where', help="SQL filter for the export, e.g. \"action='blocked'\"")
+    parser.add_argument('--limit', type=int, default=EXPORT_LIMIT, help="Maximum rows to export")
+    parser.add_argument('--output', help="Export file (default: stdout)")
+    args = parser.parse_args()
 
-# 🔰 Run
-display_database_content("database/dns_filter.db")   # <-- change database file name
+    try:
+        if args.export:
+            export_table(args.db, args.export, args.format, args.output, args.where, args.limit)
+        else:
+            inspect_database(args.db, args.samples, args.estimate)
+    except sqlite3.Error as e:
+        print(f"[!] Database error: {e}", file=sys.stderr)
+        sys.exit(1)
+    except ValueError as e:
+        print(f"[!] {e}", file=sys.stderr)
+        sys.exit(1)
+    except OSError as e:
+        print(f"[!] Output error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-# 🔚 Prevent program from closing
-input("\nPress ENTER to exit...")
+if __name__ == "__main__":
+    main()